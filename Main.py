@@ -1,31 +1,317 @@
 import os
 import json
-import re
+import mmap
+import string
 import sys
 from datetime import datetime
 from string import Template
 
+try:
+    import readline
+except ImportError:
+    # readline is not available on Windows; input() works without completion
+    readline = None
+
+# Single-file copy of all templates, used only by the eager load_templates() to
+# replace one read per file; lazy lookups read just the file they need. It is
+# stored as JSON, never pickle, so a planted index cannot run code; the name
+# must not end in .json or it would be loaded as a template.
+TEMPLATE_INDEX_FILENAME = "templates.index"
+TEMPLATE_INDEX_VERSION = 3
+
+# Templates already loaded by load_templates() in this process, keyed by
+# absolute templates path: path -> (manifest, templates)
+_TEMPLATE_CACHE = {}
+
+# Template files at least this large are decoded straight from a memory map
+MMAP_THRESHOLD = 64 * 1024
+
+# Characters allowed in template names
+_NAME_START_CHARS = frozenset(string.ascii_lowercase + '_')
+_NAME_CHARS = _NAME_START_CHARS | frozenset(string.digits)
+
+
+def _read_template_file(path, size):
+    """Read and parse a single JSON template file of the given size.
+    
+    Template files must be UTF-8, optionally with a BOM, whatever their size.
+    """
+    with open(path, 'rb') as file:
+        if size < MMAP_THRESHOLD:
+            return json.loads(str(file.read(), 'utf-8-sig'))
+        
+        # Decode from the mapped pages to skip the intermediate bytes copy
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return json.loads(str(mapped, 'utf-8-sig'))
+
+
+def _write_temp_file(path, data):
+    """Write bytes next to path in a single buffer, fsync it, and return the temporary path."""
+    temp_path = path + '.tmp'
+    # O_BINARY stops Windows from translating newlines in the written bytes
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(temp_path, flags, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        os.remove(temp_path)
+        raise
+    os.close(fd)
+    return temp_path
+
+
+def _write_file_atomic(path, data):
+    """Replace the file at path with data so readers never see a partial write."""
+    os.replace(_write_temp_file(path, data), path)
+
+
+def _parse_placeholders(text):
+    """Split a $-template into literal chunks and placeholder names.
+
+    Returns a (literals, keys) pair where literals has one more item than keys,
+    or None if the text contains an invalid placeholder.
+    """
+    literals = []
+    keys = []
+    chunk = []
+    pos = 0
+    for match in Template.pattern.finditer(text):
+        chunk.append(text[pos:match.start()])
+        pos = match.end()
+        if match.group('escaped') is not None:
+            chunk.append(Template.delimiter)
+        elif match.group('invalid') is not None:
+            return None
+        else:
+            literals.append(''.join(chunk))
+            chunk = []
+            keys.append(match.group('named') or match.group('braced'))
+    chunk.append(text[pos:])
+    literals.append(''.join(chunk))
+    return literals, keys
+
+
+def _placeholder_names(text, parsed):
+    """Return the names string.Template looks up when rendering text."""
+    if parsed is not None:
+        return parsed[1]
+    
+    # Invalid placeholders make rendering fail, but still report the valid ones
+    return [
+        match.group('named') or match.group('braced')
+        for match in Template.pattern.finditer(text)
+        if match.group('named') or match.group('braced')
+    ]
+
+
+def _make_renderer(text, parsed=None):
+    """Compile a $-template into a callable that renders it from a mapping.
+    
+    parsed may be a previous _parse_placeholders(text) result to skip tokenizing.
+    """
+    if parsed is None:
+        parsed = _parse_placeholders(text)
+    if parsed is None:
+        # Let string.Template report the invalid placeholder when rendering
+        return Template(text).substitute
+    
+    # Convert to a %-format string so rendering is a single str.__mod__ call
+    literals, keys = parsed
+    chunks = [literals[0].replace('%', '%%')]
+    for key, literal in zip(keys, literals[1:]):
+        chunks.append(f"%({key})s")
+        chunks.append(literal.replace('%', '%%'))
+    return ''.join(chunks).__mod__
+
+
 class GuestEmailGenerator:
     def __init__(self, templates_path="templates"):
         """Initialize the email generator with templates from the specified directory."""
         self.templates_path = templates_path
+        # Parsed templates, filled in as they are first used; read templates
+        # through get_template() rather than indexing this dict directly
         self.templates = {}
-        self.load_templates()
+        self._compiled = {}
+        self._required = {}
+        self._required_fields = {}
+        
+        # Templates are only listed here and parsed on first use
+        self._template_files = {}
+        self._manifest = {}
+        self._scan_templates()
     
-    def load_templates(self):
-        """Load all template files from the templates directory."""
+    def _scan_templates(self):
+        """List the template files and their modification times without parsing them."""
         # Create templates directory if it doesn't exist
         if not os.path.exists(self.templates_path):
             os.makedirs(self.templates_path)
             # Create default templates
             self._create_default_templates()
         
-        # Load template files
-        for filename in os.listdir(self.templates_path):
-            if filename.endswith('.json'):
-                template_type = filename.split('.')[0]
-                with open(os.path.join(self.templates_path, filename), 'r') as file:
-                    self.templates[template_type] = json.load(file)
+        # Record the modification time and size of every template file
+        self._manifest = {}
+        self._template_files = {}
+        with os.scandir(self.templates_path) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    stat = entry.stat()
+                    self._manifest[entry.name] = (stat.st_mtime_ns, stat.st_size)
+                    self._template_files[entry.name.split('.')[0]] = entry.path
+    
+    def load_templates(self):
+        """Load all template files from the templates directory."""
+        self._scan_templates()
+        for template_type in set(self.templates) - self._template_files.keys():
+            self._forget_template(template_type)
+        
+        # One index read replaces a read per file when it matches the directory
+        templates = self._cached_index()
+        if templates is not None:
+            for template_type, template in templates.items():
+                self._install_template(template_type, template)
+            return
+        
+        for template_type, path in self._template_files.items():
+            self._install_template(template_type, _read_template_file(path, self._file_size(path)))
+        self._save_index()
+    
+    def _load_one(self, template_type):
+        """Load and compile a single template the first time it is used."""
+        if template_type in self.templates:
+            return
+        if template_type not in self._template_files:
+            raise ValueError(f"Template type '{template_type}' not found.")
+        
+        # Read just this file; the index is only worth reading when loading everything
+        path = self._template_files[template_type]
+        try:
+            template = _read_template_file(path, self._file_size(path))
+        except FileNotFoundError:
+            # Deleted or renamed since the directory was scanned
+            del self._template_files[template_type]
+            self._manifest.pop(os.path.basename(path), None)
+            raise ValueError(f"Template type '{template_type}' not found.") from None
+        self._install_template(template_type, template)
+    
+    def _install_template(self, template_type, template):
+        """Add a loaded template and compile it."""
+        # Copy the template since update_template modifies it in place
+        self.templates[template_type] = dict(template)
+        self._compile_template(template_type)
+    
+    def _forget_template(self, template_type):
+        """Drop a template and its compiled data from memory."""
+        self.templates.pop(template_type, None)
+        self._compiled.pop(template_type, None)
+        self._required.pop(template_type, None)
+        self._required_fields.pop(template_type, None)
+    
+    def _file_size(self, path):
+        """Return the size recorded for a template file when it was scanned."""
+        return self._manifest[os.path.basename(path)][1]
+    
+    def _record_file(self, template_name, path):
+        """Update the manifest after this generator writes a template file."""
+        stat = os.stat(path)
+        self._manifest[os.path.basename(path)] = (stat.st_mtime_ns, stat.st_size)
+        self._template_files[template_name] = path
+    
+    def _invalidate_index(self):
+        """Discard the process cache and index file after a template file changes.
+        
+        A same-size edit within the filesystem's timestamp granularity leaves the
+        manifest unchanged, so stale copies must not be left around to match it.
+        """
+        _TEMPLATE_CACHE.pop(os.path.abspath(self.templates_path), None)
+        try:
+            os.remove(os.path.join(self.templates_path, TEMPLATE_INDEX_FILENAME))
+        except FileNotFoundError:
+            pass
+    
+    def _cached_index(self):
+        """Return the templates from the process cache or index file if they match the files."""
+        # Reuse templates this process already loaded if the files are unchanged
+        cache_key = os.path.abspath(self.templates_path)
+        cached = _TEMPLATE_CACHE.get(cache_key)
+        if cached is not None and cached[0] == self._manifest:
+            return cached[1]
+        
+        # Use the index file if it matches the files on disk
+        index_path = os.path.join(self.templates_path, TEMPLATE_INDEX_FILENAME)
+        templates = self._read_index(index_path, self._manifest)
+        if templates is not None:
+            _TEMPLATE_CACHE[cache_key] = (self._manifest.copy(), templates)
+        return templates
+    
+    def _read_index(self, index_path, manifest):
+        """Return the templates from the index file, or None if it is missing, stale or malformed."""
+        try:
+            with open(index_path, 'rb') as file:
+                index = json.loads(file.read())
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(index, dict) or index.get("version") != TEMPLATE_INDEX_VERSION:
+            return None
+        
+        # JSON turns the manifest tuples into lists
+        stored_manifest = index.get("manifest")
+        if not isinstance(stored_manifest, dict) or not all(
+                isinstance(value, list) for value in stored_manifest.values()):
+            return None
+        if {name: tuple(value) for name, value in stored_manifest.items()} != manifest:
+            return None
+        
+        # Check the structure before any of it is compiled
+        templates = index.get("templates")
+        if not isinstance(templates, dict):
+            return None
+        for template in templates.values():
+            if not (isinstance(template, dict)
+                    and isinstance(template.get("subject"), str)
+                    and isinstance(template.get("body"), str)):
+                return None
+        return templates
+    
+    def _save_index(self):
+        """Save the loaded templates to the process cache and the index file."""
+        manifest = self._manifest.copy()
+        templates = {name: dict(template) for name, template in self.templates.items()}
+        _TEMPLATE_CACHE[os.path.abspath(self.templates_path)] = (manifest, templates)
+        
+        index = {
+            "version": TEMPLATE_INDEX_VERSION,
+            "manifest": manifest,
+            "templates": templates
+        }
+        try:
+            index_path = os.path.join(self.templates_path, TEMPLATE_INDEX_FILENAME)
+            _write_file_atomic(index_path, json.dumps(index).encode())
+        except OSError:
+            # The index is only a cache; the JSON files remain the source of truth
+            pass
+    
+    def _compile_template(self, template_type):
+        """Cache the subject/body renderers and required fields for a template."""
+        template = self.templates[template_type]
+        subject_parsed = _parse_placeholders(template["subject"])
+        body_parsed = _parse_placeholders(template["body"])
+        
+        # Combine the placeholders the renderers look up and remove duplicates
+        required_fields = frozenset(_placeholder_names(template["subject"], subject_parsed)).union(
+            _placeholder_names(template["body"], body_parsed)
+        )
+        self._required[template_type] = required_fields
+        self._required_fields[template_type] = sorted(required_fields)
+        
+        self._compiled[template_type] = (
+            _make_renderer(template["subject"], subject_parsed),
+            _make_renderer(template["body"], body_parsed)
+        )
     
     def _create_default_templates(self):
         """Create default templates if none exist."""
@@ -120,52 +406,53 @@ $hotel_contact
             }
         }
         
-        # Save default templates to files
-        for template_name, template_content in default_templates.items():
-            with open(os.path.join(self.templates_path, f"{template_name}.json"), 'w') as file:
-                json.dump(template_content, file, indent=4)
+        # Save default templates to files, writing all of them before renaming any
+        pending = []
+        try:
+            for template_name, template_content in default_templates.items():
+                path = os.path.join(self.templates_path, f"{template_name}.json")
+                data = json.dumps(template_content, indent=4).encode()
+                pending.append((_write_temp_file(path, data), path))
+        except BaseException:
+            # Don't leave the temporary files of earlier templates behind
+            for temp_path, path in pending:
+                os.remove(temp_path)
+            raise
+        
+        for temp_path, path in pending:
+            os.replace(temp_path, path)
     
     def list_available_templates(self):
         """Return a list of available template types."""
-        return list(self.templates.keys())
+        # Taken from the directory scan, so no template has to be parsed
+        return list(self._template_files)
+    
+    def get_template(self, template_type):
+        """Return the subject and body of a template, loading it if needed."""
+        self._load_one(template_type)
+        return self.templates[template_type]
     
     def get_required_fields(self, template_type):
-        """Extract required fields from a template."""
-        if template_type not in self.templates:
-            raise ValueError(f"Template type '{template_type}' not found.")
-        
-        # Use regex to find all variables in the format $variable_name
-        template = self.templates[template_type]
-        pattern = r'\$([a-zA-Z_][a-zA-Z0-9_]*)'
-        
-        subject_fields = re.findall(pattern, template["subject"])
-        body_fields = re.findall(pattern, template["body"])
+        """Return the sorted required fields of a template."""
+        self._load_one(template_type)
         
-        # Combine and remove duplicates
-        all_fields = set(subject_fields + body_fields)
-        return sorted(all_fields)
+        # Fields are extracted when the template is compiled
+        return list(self._required_fields[template_type])
     
     def generate_email(self, template_type, guest_details):
         """Generate an email using the specified template and guest details."""
-        if template_type not in self.templates:
-            raise ValueError(f"Template type '{template_type}' not found.")
-        
-        # Get template
-        template = self.templates[template_type]
-        
-        # Check for missing required fields
-        required_fields = self.get_required_fields(template_type)
-        missing_fields = [field for field in required_fields if field not in guest_details]
-        
-        if missing_fields:
-            raise ValueError(f"Missing required guest details: {', '.join(missing_fields)}")
+        self._load_one(template_type)
         
-        # Fill in templates
-        subject_template = Template(template["subject"])
-        body_template = Template(template["body"])
+        # Get compiled renderers
+        render_subject, render_body = self._compiled[template_type]
         
-        subject = subject_template.substitute(guest_details)
-        body = body_template.substitute(guest_details)
+        # Fill in templates; missing fields are only worked out if a lookup fails
+        try:
+            subject = render_subject(guest_details)
+            body = render_body(guest_details)
+        except KeyError as error:
+            missing_fields = self._missing_fields(template_type, guest_details, error)
+            raise ValueError(f"Missing required guest details: {missing_fields}") from None
         
         return {
             "to": guest_details.get("guest_email", ""),
@@ -173,9 +460,52 @@ $hotel_contact
             "body": body
         }
     
+    def generate_emails(self, template_type, guest_details_list):
+        """Generate one email per set of guest details using the same template."""
+        self._load_one(template_type)
+        
+        # Look up the compiled renderers once for the whole batch
+        render_subject, render_body = self._compiled[template_type]
+        guest_details_list = list(guest_details_list)
+        
+        # Render every record with map so the loop runs in C
+        try:
+            subjects = list(map(render_subject, guest_details_list))
+            bodies = list(map(render_body, guest_details_list))
+        except KeyError:
+            # Find the first record with missing details to report it
+            for index, guest_details in enumerate(guest_details_list):
+                try:
+                    render_subject(guest_details)
+                    render_body(guest_details)
+                except KeyError as error:
+                    missing_fields = self._missing_fields(template_type, guest_details, error)
+                    raise ValueError(
+                        f"Missing required guest details for record {index}: {missing_fields}"
+                    ) from None
+            raise
+        
+        return [
+            {
+                "to": guest_details.get("guest_email", ""),
+                "subject": subject,
+                "body": body
+            }
+            for guest_details, subject, body in zip(guest_details_list, subjects, bodies)
+        ]
+    
+    def _missing_fields(self, template_type, guest_details, error):
+        """Describe the fields missing from guest_details after a failed lookup."""
+        # Set difference against the dict keys
+        missing_fields = self._required[template_type] - guest_details.keys()
+        if not missing_fields:
+            # The mapping itself raised KeyError for a key it reports as present
+            missing_fields = {error.args[0]}
+        return ', '.join(sorted(missing_fields))
+    
     def add_template(self, template_name, subject_template, body_template):
         """Add a new email template."""
-        if template_name in self.templates:
+        if template_name in self._template_files:
             raise ValueError(f"Template '{template_name}' already exists.")
         
         # Create and save the new template
@@ -185,19 +515,22 @@ $hotel_contact
         }
         
         self.templates[template_name] = template
+        self._compile_template(template_name)
         
         # Save to file
-        with open(os.path.join(self.templates_path, f"{template_name}.json"), 'w') as file:
-            json.dump(template, file, indent=4)
+        path = os.path.join(self.templates_path, f"{template_name}.json")
+        _write_file_atomic(path, json.dumps(template, indent=4).encode())
+        self._record_file(template_name, path)
+        self._invalidate_index()
         
         return template_name
     
     def update_template(self, template_name, subject_template=None, body_template=None):
         """Update an existing email template."""
-        if template_name not in self.templates:
+        if template_name not in self._template_files:
             raise ValueError(f"Template '{template_name}' not found.")
         
-        template = self.templates[template_name]
+        template = self.get_template(template_name)
         
         if subject_template is not None:
             template["subject"] = subject_template
@@ -205,31 +538,76 @@ $hotel_contact
         if body_template is not None:
             template["body"] = body_template
         
+        # Recompile the cached templates
+        self._compile_template(template_name)
+        
         # Save changes to file
-        with open(os.path.join(self.templates_path, f"{template_name}.json"), 'w') as file:
-            json.dump(template, file, indent=4)
+        path = os.path.join(self.templates_path, f"{template_name}.json")
+        _write_file_atomic(path, json.dumps(template, indent=4).encode())
+        self._record_file(template_name, path)
+        self._invalidate_index()
         
         return template_name
     
     def delete_template(self, template_name):
         """Delete an email template."""
-        if template_name not in self.templates:
+        if template_name not in self._template_files:
             raise ValueError(f"Template '{template_name}' not found.")
         
-        # Remove from dict
-        del self.templates[template_name]
+        # Remove from dicts
+        self._forget_template(template_name)
+        del self._template_files[template_name]
         
         # Remove file
         template_path = os.path.join(self.templates_path, f"{template_name}.json")
+        self._manifest.pop(f"{template_name}.json", None)
         if os.path.exists(template_path):
             os.remove(template_path)
+        self._invalidate_index()
         
         return template_name
 
 
 def clear_screen():
     """Clear the console screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # Erase the display and move the cursor home without spawning a shell
+    sys.stdout.write('\x1b[2J\x1b[H')
+    sys.stdout.flush()
+
+
+# Values previously entered for each guest detail field, offered for tab completion
+_field_history = {}
+
+
+def enable_completion():
+    """Bind the tab key to readline completion of whole input lines."""
+    if readline is None:
+        return
+    
+    if 'libedit' in (readline.__doc__ or ''):
+        readline.parse_and_bind('bind ^I rl_complete')
+    else:
+        readline.parse_and_bind('tab: complete')
+    readline.set_completer_delims('')
+
+
+def prompt(message, completions=()):
+    """Read a line of input, offering completions that start with the typed text."""
+    if readline is None:
+        return input(message)
+    
+    matches = []
+    
+    def complete(text, state):
+        if state == 0:
+            matches[:] = [option for option in completions if option.startswith(text)]
+        return matches[state] if state < len(matches) else None
+    
+    readline.set_completer(complete)
+    try:
+        return input(message)
+    finally:
+        readline.set_completer(None)
 
 
 def print_menu():
@@ -252,14 +630,18 @@ def get_template_selection(generator):
         print(f"{i}. {template}")
     
     while True:
+        choice = prompt("\nSelect a template (number or name): ", templates)
+        if choice in templates:
+            return choice
+        
         try:
-            choice = int(input("\nSelect a template (number): "))
+            choice = int(choice)
             if 1 <= choice <= len(templates):
                 return templates[choice - 1]
             else:
                 print("Invalid choice. Please try again.")
         except ValueError:
-            print("Please enter a number.")
+            print("Please enter a number or template name.")
 
 
 def collect_guest_details(generator, template_type):
@@ -271,8 +653,15 @@ def collect_guest_details(generator, template_type):
     for field in required_fields:
         # Format the field name for better readability
         field_display = field.replace('_', ' ').title()
-        value = input(f"{field_display}: ")
+        history = _field_history.setdefault(field, [])
+        value = prompt(f"{field_display}: ", history)
         guest_details[field] = value
+        
+        # Remember the value for completion, most recent first
+        if value:
+            if value in history:
+                history.remove(value)
+            history.insert(0, value)
     
     return guest_details
 
@@ -315,11 +704,14 @@ def view_templates(generator):
         print("No templates available.")
         return
     
-    print("\nAvailable templates:")
-    for i, template_name in enumerate(templates, 1):
-        print(f"{i}. {template_name}")
-    
+    show_list = True
     while True:
+        if show_list:
+            print("\nAvailable templates:")
+            for i, template_name in enumerate(templates, 1):
+                print(f"{i}. {template_name}")
+            show_list = False
+        
         try:
             choice = input("\nEnter a number to view template details (or 'b' to go back): ")
             if choice.lower() == 'b':
@@ -328,7 +720,7 @@ def view_templates(generator):
             choice = int(choice)
             if 1 <= choice <= len(templates):
                 template_name = templates[choice - 1]
-                template = generator.templates[template_name]
+                template = generator.get_template(template_name)
                 
                 clear_screen()
                 print(f"\n===== Template: {template_name} =====")
@@ -339,24 +731,29 @@ def view_templates(generator):
                 print("===============================")
                 
                 input("\nPress Enter to continue...")
-                return view_templates(generator)
+                show_list = True
             else:
                 print("Invalid choice. Please try again.")
         except ValueError:
             print("Please enter a number or 'b'.")
 
 
+def is_valid_template_name(name):
+    """Check that a template name uses lowercase letters, numbers, and underscores only."""
+    return bool(name) and name[0] in _NAME_START_CHARS and _NAME_CHARS.issuperset(name)
+
+
 def create_template(generator):
     """Create a new email template."""
     template_name = input("\nEnter a name for the new template (lowercase, no spaces): ")
     
     # Validate template name
-    if not re.match(r'^[a-z_][a-z0-9_]*$', template_name):
+    if not is_valid_template_name(template_name):
         print("Invalid template name. Use lowercase letters, numbers, and underscores only.")
         input("Press Enter to continue...")
         return
     
-    if template_name in generator.templates:
+    if template_name in generator.list_available_templates():
         print(f"Template '{template_name}' already exists.")
         input("Press Enter to continue...")
         return
@@ -389,7 +786,7 @@ def create_template(generator):
 def update_template(generator):
     """Update an existing email template."""
     template_name = get_template_selection(generator)
-    template = generator.templates[template_name]
+    template = generator.get_template(template_name)
     
     print(f"\nCurrent subject: {template['subject']}")
     print("Enter new subject (or press Enter to keep current):")
@@ -440,6 +837,11 @@ def delete_template(generator):
 
 def main():
     """Main function to run the interactive email generator."""
+    # Enable ANSI escape processing in the Windows console used by clear_screen
+    if os.name == 'nt':
+        os.system('')
+    
+    enable_completion()
     generator = GuestEmailGenerator()
     
     while True:
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import Main
+
+
+class TemplateIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.templates_path = os.path.join(self.tmpdir, "templates")
+        Main._TEMPLATE_CACHE.clear()
+
+    def tearDown(self):
+        Main._TEMPLATE_CACHE.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def _load_all(self, generator):
+        """Load every template so the process cache and index file are written."""
+        generator.load_templates()
+        self.assertTrue(os.path.exists(os.path.join(self.templates_path, Main.TEMPLATE_INDEX_FILENAME)))
+
+    def test_same_size_update_is_not_served_from_stale_index(self):
+        # "Hello" -> "Howdy" keeps the file size, and within the filesystem's
+        # timestamp granularity the mtime as well
+        for clear_process_cache in (False, True):
+            with self.subTest(clear_process_cache=clear_process_cache):
+                for _ in range(20):
+                    shutil.rmtree(self.templates_path, ignore_errors=True)
+                    Main._TEMPLATE_CACHE.clear()
+
+                    generator = Main.GuestEmailGenerator(self.templates_path)
+                    generator.add_template("t1", "Hello $a", "b")
+                    self._load_all(generator)
+                    generator.update_template("t1", subject_template="Howdy $a")
+
+                    if clear_process_cache:
+                        Main._TEMPLATE_CACHE.clear()
+                    reloaded = Main.GuestEmailGenerator(self.templates_path)
+                    self.assertEqual(reloaded.get_template("t1")["subject"], "Howdy $a")
+
+    def test_lazy_lookup_parses_only_requested_template(self):
+        generator = Main.GuestEmailGenerator(self.templates_path)
+        self._load_all(generator)
+
+        reloaded = Main.GuestEmailGenerator(self.templates_path)
+        reloaded.get_template("booking_confirmation")
+        self.assertEqual(list(reloaded.templates), ["booking_confirmation"])
+
+    def test_template_removed_after_scan_is_reported_as_not_found(self):
+        generator = Main.GuestEmailGenerator(self.templates_path)
+        os.remove(os.path.join(self.templates_path, "feedback_request.json"))
+
+        with self.assertRaisesRegex(ValueError, "not found"):
+            generator.get_template("feedback_request")
+        self.assertNotIn("feedback_request", generator.list_available_templates())
+
+    def test_deleted_template_is_not_served_from_index(self):
+        generator = Main.GuestEmailGenerator(self.templates_path)
+        generator.add_template("t1", "Hello $a", "b")
+        self._load_all(generator)
+        generator.delete_template("t1")
+
+        reloaded = Main.GuestEmailGenerator(self.templates_path)
+        self.assertNotIn("t1", reloaded.list_available_templates())
+        self._load_all(reloaded)
+        self.assertNotIn("t1", reloaded.templates)
+
+
+if __name__ == "__main__":
+    unittest.main()